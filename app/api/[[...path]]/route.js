@@ -1,7 +1,8 @@
 import { NextResponse } from 'next/server';
-import { getDb } from '@/lib/mongodb';
+import { getDb, getPoolMetrics, resetPoolMetrics } from '@/lib/mongodb';
 import { hashPassword, verifyPassword, generateToken, getUserFromRequest } from '@/lib/auth';
 import { v4 as uuidv4 } from 'uuid';
+import { timingSafeEqual } from 'crypto';
 import { sampleCourses, sampleModules } from '@/lib/sampleData';
 
 // CORS headers
@@ -497,6 +498,44 @@ async function handleSubmitQuiz(request) {
   }
 }
 
+// ==================== POOL METRICS ====================
+
+// Served only when POOL_METRICS_ENABLED=true and the request carries the shared
+// POOL_METRICS_TOKEN in the x-metrics-token header. Responses carry no CORS
+// headers so browsers on other origins can't read or trigger them.
+const METRICS_TOKEN_HEADER = 'x-metrics-token';
+
+function createMetricsResponse(data, status = 200) {
+  return NextResponse.json(data, { status, headers: { 'Cache-Control': 'no-store' } });
+}
+
+function checkMetricsAccess(request) {
+  const expected = process.env.POOL_METRICS_TOKEN;
+  if (process.env.POOL_METRICS_ENABLED !== 'true' || !expected) {
+    return createMetricsResponse({ error: 'Not found' }, 404);
+  }
+
+  const supplied = Buffer.from(request.headers.get(METRICS_TOKEN_HEADER) || '');
+  const token = Buffer.from(expected);
+  if (supplied.length !== token.length || !timingSafeEqual(supplied, token)) {
+    return createMetricsResponse({ error: 'Unauthorized' }, 401);
+  }
+  return null;
+}
+
+async function handleGetPoolMetrics(request) {
+  const denied = checkMetricsAccess(request);
+  if (denied) return denied;
+  return createMetricsResponse(getPoolMetrics());
+}
+
+async function handleResetPoolMetrics(request) {
+  const denied = checkMetricsAccess(request);
+  if (denied) return denied;
+  resetPoolMetrics();
+  return createMetricsResponse({ success: true });
+}
+
 // ==================== MAIN HANDLER ====================
 
 export async function GET(request, { params }) {
@@ -521,6 +560,7 @@ export async function GET(request, { params }) {
     if (path === 'progress') return handleGetProgress(request);
     if (path === 'analytics') return handleGetAnalytics(request);
     if (path === 'reports/csv') return handleExportCSV(request);
+    if (path === 'metrics/pool') return handleGetPoolMetrics(request);
 
     return createResponse({ error: 'Not found' }, 404);
   } catch (error) {
@@ -537,6 +577,7 @@ export async function POST(request, { params }) {
     if (path === 'auth/login') return handleLogin(request);
     if (path === 'statements') return handlePostStatement(request);
     if (path === 'quiz/submit') return handleSubmitQuiz(request);
+    if (path === 'metrics/pool/reset') return handleResetPoolMetrics(request);
     if (path.match(/^courses\/[^/]+\/enroll$/)) {
       const courseId = path.split('/')[1];
       return handleEnrollCourse(request, courseId);
@@ -549,6 +590,8 @@ export async function POST(request, { params }) {
   }
 }
 
-export async function OPTIONS(request) {
+export async function OPTIONS(request, { params }) {
+  const path = params.path?.join('/') || '';
+  if (path.startsWith('metrics/')) return new NextResponse(null, { status: 204 });
   return new NextResponse(null, { status: 200, headers: corsHeaders });
 }
\ No newline at end of file
@@ -10,10 +10,37 @@ import time
 import uuid
 from datetime import datetime
 import os
+import argparse
+import socket
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
 
 # Get base URL from environment
 BASE_URL = "https://ethicomply.preview.emergentagent.com/api"
 
+# Pool saturation scenario runs against a local app backed by a local mongod
+LOCAL_BASE_URL = os.environ.get("LOCAL_BASE_URL", "http://localhost:3000/api")
+LOCAL_MONGO_URL = os.environ.get("MONGO_URL", "mongodb://localhost:27017")
+POOL_METRICS_TOKEN = os.environ.get("POOL_METRICS_TOKEN", "")
+LOOPBACK_HOSTS = ('localhost', '127.0.0.1', '::1')
+
+def split_host_port(entry, default_port=27017):
+    """Split "host[:port]" or "[ipv6][:port]" into (host, port)"""
+    if entry.startswith('['):
+        host, _, port = entry[1:].partition(']')
+        port = port.lstrip(':')
+    else:
+        host, _, port = entry.partition(':')
+    if not host:
+        raise ValueError(f"empty host in {entry!r}")
+    if port and not port.isdigit():
+        raise ValueError(f"invalid port {port!r} for host {host}")
+    return host, int(port) if port else default_port
+
+def is_loopback_host(host):
+    """True when host names the local machine"""
+    return host in LOOPBACK_HOSTS
+
 class EthicsComplianceAPITester:
     def __init__(self):
         self.base_url = BASE_URL
@@ -638,8 +665,307 @@ class EthicsComplianceAPITester:
             if result['success']:
                 print(f"  - {result['test']}: {result['message']}")
 
+class PoolSaturationTester:
+    """Ramps concurrency against a local app until MongoDB pool checkout waits dominate request time"""
+
+    def __init__(self, base_url=LOCAL_BASE_URL, mongo_url=LOCAL_MONGO_URL, metrics_token=POOL_METRICS_TOKEN,
+                 max_concurrency=None, step_seconds=5, warmup_seconds=1, dominance_threshold=0.5,
+                 endpoint='/courses'):
+        self.base_url = base_url
+        self.mongo_url = mongo_url
+        self.metrics_headers = {'x-metrics-token': metrics_token}
+        # None ramps to twice the app's maxPoolSize, read from the metrics endpoint
+        self.max_concurrency = max_concurrency
+        self.step_seconds = step_seconds
+        self.warmup_seconds = warmup_seconds
+        self.dominance_threshold = dominance_threshold
+        self.endpoint = endpoint
+        self.steps = []
+
+    def parse_mongo_hosts(self):
+        """Split a mongodb:// URI into (host, port) pairs, one per seed host"""
+        scheme, sep, rest = self.mongo_url.partition('://')
+        if not sep or scheme != 'mongodb':
+            raise ValueError(f"expected a mongodb:// URI, got {self.mongo_url!r}")
+
+        host_list = rest.split('/', 1)[0].split('?', 1)[0].rpartition('@')[2]
+        return [split_host_port(entry) for entry in host_list.split(',')]
+
+    def check_local_app(self):
+        """Refuse to load anything but an app on this machine"""
+        host = urlparse(self.base_url).hostname
+        if not is_loopback_host(host):
+            print(f"❌ LOCAL_BASE_URL must point at a local app, got {host or self.base_url}")
+            return False
+        return True
+
+    def check_local_mongod(self):
+        """Verify every host in the local MONGO_URL has a mongod listening"""
+        try:
+            hosts = self.parse_mongo_hosts()
+        except ValueError as e:
+            print(f"❌ Cannot parse MONGO_URL: {e}")
+            return False
+
+        for host, port in hosts:
+            if not is_loopback_host(host):
+                print(f"❌ MONGO_URL must point at a local mongod, got {host}")
+                return False
+
+            try:
+                with socket.create_connection((host, port), timeout=5):
+                    pass
+            except OSError as e:
+                print(f"❌ No mongod listening on {host}:{port}: {e}")
+                return False
+
+            print(f"✅ mongod reachable on {host}:{port}")
+        return True
+
+    def check_app_servers(self, metrics):
+        """Verify every server the app's pool has connected to is on loopback"""
+        addresses = [server['address'] for server in metrics.get('servers', [])]
+        if not addresses:
+            print("❌ The app has not reported any MongoDB server addresses")
+            return False
+
+        for address in addresses:
+            try:
+                host, _ = split_host_port(address)
+            except ValueError as e:
+                print(f"❌ Cannot parse app server address {address!r}: {e}")
+                return False
+            if not is_loopback_host(host):
+                print(f"❌ The app is connected to {address}, not a local mongod")
+                return False
+
+        print(f"✅ App pool connected to {', '.join(addresses)}")
+        return True
+
+    def get_pool_metrics(self):
+        """Fetch pool metrics from the local metrics endpoint"""
+        try:
+            response = requests.get(f"{self.base_url}/metrics/pool", headers=self.metrics_headers, timeout=10)
+            if response.status_code == 200:
+                return response.json()
+            print(f"Metrics request failed with status {response.status_code}")
+        except (requests.exceptions.RequestException, json.JSONDecodeError) as e:
+            print(f"Metrics request failed: {e}")
+        return None
+
+    def reset_pool_metrics(self):
+        """Reset pool counters so each step is measured on its own"""
+        try:
+            response = requests.post(f"{self.base_url}/metrics/pool/reset", headers=self.metrics_headers,
+                                     timeout=10)
+            return response.status_code == 200
+        except requests.exceptions.RequestException as e:
+            print(f"Metrics reset failed: {e}")
+            return False
+
+    def _worker(self, deadline):
+        """Issue requests back to back until the deadline, returning per-request latencies"""
+        session = requests.Session()
+        latencies = []
+        errors = 0
+        url = f"{self.base_url}{self.endpoint}"
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                response = session.get(url, timeout=30)
+                if response.status_code != 200:
+                    errors += 1
+            except requests.exceptions.RequestException:
+                errors += 1
+            latencies.append((time.perf_counter() - start) * 1000)
+        session.close()
+        return latencies, errors
+
+    def _drive(self, concurrency, seconds):
+        """Run `concurrency` workers for `seconds` and collect their results"""
+        deadline = time.perf_counter() + seconds
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures = [executor.submit(self._worker, deadline) for _ in range(concurrency)]
+            results = [future.result() for future in futures]
+
+        latencies = [latency for worker_latencies, _ in results for latency in worker_latencies]
+        errors = sum(worker_errors for _, worker_errors in results)
+        return latencies, errors
+
+    def run_step(self, concurrency):
+        """Measure request latency and pool checkout wait at one concurrency level"""
+        # Warm up so connection establishment isn't counted as checkout wait
+        self._drive(concurrency, self.warmup_seconds)
+        if not self.reset_pool_metrics():
+            return None
+
+        started = time.perf_counter()
+        latencies, errors = self._drive(concurrency, self.step_seconds)
+        elapsed = time.perf_counter() - started
+
+        metrics = self.get_pool_metrics()
+        if metrics is None or not latencies:
+            return None
+
+        latencies.sort()
+        request_ms = sum(latencies)
+        checkout = metrics['checkoutLatency']
+        step = {
+            'concurrency': concurrency,
+            'requests': len(latencies),
+            'errors': errors,
+            'throughput': len(latencies) / elapsed,
+            'meanLatencyMs': request_ms / len(latencies),
+            'p95LatencyMs': latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+            'checkouts': checkout['count'],
+            'meanCheckoutWaitMs': checkout['meanMs'],
+            'maxCheckoutWaitMs': checkout['maxMs'],
+            'checkoutWaitShare': min(1.0, checkout['sumMs'] / request_ms) if request_ms else 0.0,
+            'peakCheckedOut': metrics['peakCheckedOut'],
+            'peakWaitQueueDepth': metrics['peakWaitQueueDepth'],
+            'checkoutsFailed': sum(metrics['checkoutsFailed'].values()),
+        }
+        self.steps.append(step)
+        return step
+
+    def find_knee(self):
+        """Return the first step where checkout waits dominate request time, if any"""
+        for step in self.steps:
+            if step['checkoutWaitShare'] >= self.dominance_threshold:
+                return step
+        return None
+
+    def find_throughput_knee(self):
+        """Return the step farthest from the chord of the normalized throughput curve"""
+        if len(self.steps) < 3:
+            return None
+
+        xs = [step['concurrency'] for step in self.steps]
+        ys = [step['throughput'] for step in self.steps]
+        x_span = (xs[-1] - xs[0]) or 1
+        y_span = (max(ys) - min(ys)) or 1
+        norm_x = [(x - xs[0]) / x_span for x in xs]
+        norm_y = [(y - min(ys)) / y_span for y in ys]
+
+        # Distance above the straight line from the first to the last point
+        x0, y0, x1, y1 = norm_x[0], norm_y[0], norm_x[-1], norm_y[-1]
+        distances = [
+            (y - y0) - (y1 - y0) * (x - x0) / ((x1 - x0) or 1)
+            for x, y in zip(norm_x, norm_y)
+        ]
+        best = max(range(len(distances)), key=lambda i: distances[i])
+        return self.steps[best] if distances[best] > 0 else None
+
+    def run_saturation_test(self):
+        """Ramp concurrency in doublings until checkout waits dominate or the cap is reached"""
+        print("🚀 Starting MongoDB Connection Pool Saturation Test")
+        print(f"Base URL: {self.base_url}")
+        print(f"Endpoint: {self.endpoint}")
+        print("=" * 60)
+
+        if not self.check_local_app() or not self.check_local_mongod():
+            return False
+
+        # One request makes the app open its pool so the server addresses are known
+        try:
+            requests.get(f"{self.base_url}{self.endpoint}", timeout=30)
+        except requests.exceptions.RequestException as e:
+            print(f"❌ App request failed: {e}")
+            return False
+        metrics = self.get_pool_metrics()
+        if metrics is None:
+            print("❌ Pool metrics endpoint unavailable - is the app running locally with "
+                  "POOL_METRICS_ENABLED=true and a matching POOL_METRICS_TOKEN?")
+            return False
+        if not self.check_app_servers(metrics):
+            return False
+        options = metrics.get('options', {})
+        print(f"Pool options: {options}")
+
+        max_concurrency = self.max_concurrency
+        if max_concurrency is None:
+            max_pool_size = options.get('maxPoolSize', 100)
+            if max_pool_size == 0:
+                print("❌ maxPoolSize is unlimited - pass --max-concurrency to choose a ramp ceiling")
+                return False
+            max_concurrency = 2 * max_pool_size
+        print(f"Ramping concurrency up to {max_concurrency}")
+
+        print(f"\n{'conc':>5} {'req/s':>8} {'mean ms':>9} {'p95 ms':>9} {'wait ms':>9} "
+              f"{'wait %':>7} {'out':>5} {'queue':>6} {'errors':>7}")
+
+        concurrency = 1
+        while True:
+            step = self.run_step(concurrency)
+            if step is None:
+                print(f"❌ Step at concurrency {concurrency} failed - stopping ramp")
+                break
+
+            print(f"{step['concurrency']:>5} {step['throughput']:>8.1f} {step['meanLatencyMs']:>9.1f} "
+                  f"{step['p95LatencyMs']:>9.1f} {step['meanCheckoutWaitMs']:>9.2f} "
+                  f"{step['checkoutWaitShare'] * 100:>6.1f}% {step['peakCheckedOut']:>5} "
+                  f"{step['peakWaitQueueDepth']:>6} {step['errors'] + step['checkoutsFailed']:>7}")
+
+            if step['checkoutWaitShare'] >= self.dominance_threshold or concurrency >= max_concurrency:
+                break
+            concurrency = min(concurrency * 2, max_concurrency)
+
+        self.print_saturation_summary()
+        return bool(self.steps)
+
+    def print_saturation_summary(self):
+        """Print where the pool became the bottleneck"""
+        print("\n" + "=" * 60)
+        print("📊 POOL SATURATION SUMMARY")
+        print("=" * 60)
+
+        if not self.steps:
+            print("No steps completed")
+            return
+
+        knee = self.find_knee()
+        if knee:
+            print(f"Checkout waits dominate at concurrency {knee['concurrency']}: "
+                  f"{knee['checkoutWaitShare'] * 100:.1f}% of request time spent waiting for a connection "
+                  f"(mean wait {knee['meanCheckoutWaitMs']:.2f} ms, peak wait queue {knee['peakWaitQueueDepth']})")
+        else:
+            print(f"Checkout wait stayed below {self.dominance_threshold * 100:.0f}% of request time "
+                  f"up to concurrency {self.steps[-1]['concurrency']}")
+
+        throughput_knee = self.find_throughput_knee()
+        if throughput_knee:
+            print(f"Throughput knee at concurrency {throughput_knee['concurrency']}: "
+                  f"{throughput_knee['throughput']:.1f} req/s")
+
+
+def parse_args():
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Backend API test suite")
+    parser.add_argument('--pool-saturation', action='store_true',
+                        help="run the MongoDB pool saturation scenario against a local app and mongod")
+    parser.add_argument('--max-concurrency', type=int, default=None,
+                        help="highest concurrency to ramp to (default: twice the app's maxPoolSize)")
+    parser.add_argument('--step-seconds', type=float, default=5,
+                        help="measured duration of each concurrency step (default: 5)")
+    parser.add_argument('--threshold', type=float, default=0.5,
+                        help="share of request time spent waiting for a connection that counts as "
+                             "dominating (default: 0.5)")
+    return parser.parse_args()
+
 def main():
     """Main test execution"""
+    args = parse_args()
+    if args.pool_saturation:
+        tester = PoolSaturationTester(max_concurrency=args.max_concurrency, step_seconds=args.step_seconds,
+                                      dominance_threshold=args.threshold)
+        try:
+            if not tester.run_saturation_test():
+                exit(1)
+        except KeyboardInterrupt:
+            print("\n⚠️ Testing interrupted by user")
+            exit(1)
+        return
+
     print("Ethics and Compliance Training Platform - Backend API Test Suite")
     print("Testing xAPI-compliant Learning Management System")
     
@@ -7,18 +7,207 @@ if (!uri) {
   throw new Error('Please add your Mongo URI to .env');
 }
 
-let client;
+function readIntEnv(name) {
+  const raw = process.env[name];
+  if (raw === undefined || raw === '') return undefined;
+  if (!/^\d+$/.test(raw)) {
+    throw new Error(`${name} must be a non-negative integer, got "${raw}"`);
+  }
+  return parseInt(raw, 10);
+}
+
+// Pool sizing and timeouts; anything left unset falls back to the driver default
+const poolEnv = {
+  maxPoolSize: 'MONGO_MAX_POOL_SIZE',
+  minPoolSize: 'MONGO_MIN_POOL_SIZE',
+  maxConnecting: 'MONGO_MAX_CONNECTING',
+  maxIdleTimeMS: 'MONGO_MAX_IDLE_TIME_MS',
+  waitQueueTimeoutMS: 'MONGO_WAIT_QUEUE_TIMEOUT_MS',
+  connectTimeoutMS: 'MONGO_CONNECT_TIMEOUT_MS',
+  serverSelectionTimeoutMS: 'MONGO_SERVER_SELECTION_TIMEOUT_MS',
+};
+
+export const poolOptions = Object.fromEntries(
+  Object.entries(poolEnv)
+    .map(([option, envName]) => [option, readIntEnv(envName)])
+    .filter(([, value]) => value !== undefined)
+);
+
+// ==================== POOL METRICS ====================
+
+// Driver default when MONGO_MAX_POOL_SIZE is unset; 0 means no limit
+const maxPoolSize = poolOptions.maxPoolSize ?? 100;
+
+const LATENCY_BUCKETS_MS = [1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000];
+
+function createPoolMetrics() {
+  return {
+    since: new Date().toISOString(),
+    checkedOut: 0,
+    pendingCheckouts: 0,
+    waitQueueDepth: 0,
+    peakCheckedOut: 0,
+    peakPendingCheckouts: 0,
+    peakWaitQueueDepth: 0,
+    totalConnections: 0,
+    connectionsCreated: 0,
+    connectionsClosed: 0,
+    poolCleared: 0,
+    checkoutsStarted: 0,
+    checkoutsSucceeded: 0,
+    checkoutsFailed: {},
+    checkoutLatency: {
+      count: 0,
+      sumMs: 0,
+      maxMs: 0,
+      buckets: LATENCY_BUCKETS_MS.map(le => ({ le, count: 0 })).concat({ le: '+Inf', count: 0 }),
+    },
+  };
+}
+
+// Per server address: connections checked out and the start times of checkouts
+// still in flight, oldest first. maxPoolSize is a per-server limit, so queuing
+// is judged against each address's own counts.
+function createPoolState() {
+  return { metrics: createPoolMetrics(), servers: new Map() };
+}
+
+function getServer(state, address) {
+  if (!state.servers.has(address)) state.servers.set(address, { checkedOut: 0, pending: [] });
+  return state.servers.get(address);
+}
+
+function recordCheckoutLatency(metrics, durationMs) {
+  const latency = metrics.checkoutLatency;
+  latency.count++;
+  latency.sumMs += durationMs;
+  latency.maxMs = Math.max(latency.maxMs, durationMs);
+  const bucket = latency.buckets.find(b => b.le === '+Inf' || durationMs <= b.le);
+  bucket.count++;
+}
+
+// Recomputes the live gauges from the per-address counts. waitQueueDepth is the
+// number of in-flight checkouts on each address beyond its free slots, i.e.
+// checkouts that cannot be served until a connection is checked back in.
+function updateGauges(state) {
+  const { metrics, servers } = state;
+  let checkedOut = 0;
+  let pendingCheckouts = 0;
+  let waitQueueDepth = 0;
+  for (const server of servers.values()) {
+    checkedOut += server.checkedOut;
+    pendingCheckouts += server.pending.length;
+    if (maxPoolSize > 0) {
+      waitQueueDepth += Math.max(0, server.pending.length - Math.max(0, maxPoolSize - server.checkedOut));
+    }
+  }
+  Object.assign(metrics, { checkedOut, pendingCheckouts, waitQueueDepth });
+  metrics.peakCheckedOut = Math.max(metrics.peakCheckedOut, checkedOut);
+  metrics.peakPendingCheckouts = Math.max(metrics.peakPendingCheckouts, pendingCheckouts);
+  metrics.peakWaitQueueDepth = Math.max(metrics.peakWaitQueueDepth, waitQueueDepth);
+}
+
+// Drivers from 6.9 report durationMS on checkout events. Older ones don't, so the
+// wait is measured from the oldest pending start on that address, which is exact
+// for the pool's FIFO wait queue but approximate when a checkout fails out of order.
+function finishCheckout(state, event) {
+  const startedAt = getServer(state, event.address).pending.shift();
+  const durationMs = typeof event.durationMS === 'number'
+    ? event.durationMS
+    : startedAt !== undefined ? performance.now() - startedAt : undefined;
+  if (durationMs !== undefined) recordCheckoutLatency(state.metrics, durationMs);
+}
+
+function attachPoolMonitoring(client, state) {
+  client.on('connectionCheckOutStarted', event => {
+    getServer(state, event.address).pending.push(performance.now());
+    state.metrics.checkoutsStarted++;
+    updateGauges(state);
+  });
+
+  client.on('connectionCheckedOut', event => {
+    finishCheckout(state, event);
+    getServer(state, event.address).checkedOut++;
+    state.metrics.checkoutsSucceeded++;
+    updateGauges(state);
+  });
+
+  client.on('connectionCheckOutFailed', event => {
+    const { metrics } = state;
+    finishCheckout(state, event);
+    metrics.checkoutsFailed[event.reason] = (metrics.checkoutsFailed[event.reason] || 0) + 1;
+    updateGauges(state);
+  });
+
+  client.on('connectionCheckedIn', event => {
+    const server = getServer(state, event.address);
+    server.checkedOut = Math.max(0, server.checkedOut - 1);
+    updateGauges(state);
+  });
+
+  client.on('connectionCreated', event => {
+    getServer(state, event.address);
+    state.metrics.connectionsCreated++;
+    state.metrics.totalConnections++;
+  });
+
+  client.on('connectionClosed', () => {
+    state.metrics.connectionsClosed++;
+    state.metrics.totalConnections = Math.max(0, state.metrics.totalConnections - 1);
+  });
+
+  client.on('connectionPoolCleared', () => {
+    state.metrics.poolCleared++;
+  });
+}
+
+function connectClient(state) {
+  const client = new MongoClient(uri, poolOptions);
+  attachPoolMonitoring(client, state);
+  return client.connect();
+}
+
 let clientPromise;
+let poolState;
 
 if (process.env.NODE_ENV === 'development') {
   if (!global._mongoClientPromise) {
-    client = new MongoClient(uri);
-    global._mongoClientPromise = client.connect();
+    global._mongoPoolState = createPoolState();
+    global._mongoClientPromise = connectClient(global._mongoPoolState);
   }
   clientPromise = global._mongoClientPromise;
+  poolState = global._mongoPoolState;
 } else {
-  client = new MongoClient(uri);
-  clientPromise = client.connect();
+  poolState = createPoolState();
+  clientPromise = connectClient(poolState);
+}
+
+export function getPoolMetrics() {
+  const { metrics } = poolState;
+  const latency = metrics.checkoutLatency;
+  return {
+    ...metrics,
+    options: { ...poolOptions, maxPoolSize },
+    servers: Array.from(poolState.servers, ([address, server]) => ({
+      address,
+      checkedOut: server.checkedOut,
+      pendingCheckouts: server.pending.length,
+    })),
+    checkoutsFailed: { ...metrics.checkoutsFailed },
+    checkoutLatency: {
+      ...latency,
+      meanMs: latency.count ? latency.sumMs / latency.count : 0,
+      buckets: latency.buckets.map(b => ({ ...b })),
+    },
+  };
+}
+
+// Resets counters, peaks and latencies. Live gauges are derived from the
+// per-address state, which carries over so they stay consistent with the pool.
+export function resetPoolMetrics() {
+  const { totalConnections } = poolState.metrics;
+  poolState.metrics = { ...createPoolMetrics(), totalConnections };
+  updateGauges(poolState);
 }
 
 export async function getDb() {
@@ -26,4 +215,4 @@ export async function getDb() {
   return client.db(dbName);
 }
 
-export default clientPromise;
\ No newline at end of file
+export default clientPromise;
@@ -25,7 +25,8 @@ const nextConfig = {
   async headers() {
     return [
       {
-        source: "/(.*)",
+        // Pool metrics routes are token-guarded and must not be cross-origin readable
+        source: "/((?!api/metrics/).*)",
         headers: [
           { key: "X-Frame-Options", value: "ALLOWALL" },
           { key: "Content-Security-Policy", value: "frame-ancestors *;" },
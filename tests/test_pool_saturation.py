@@ -0,0 +1,97 @@
+"""
+Unit tests for the pool saturation scenario helpers in backend_test.py
+"""
+
+import unittest
+
+from backend_test import PoolSaturationTester, is_loopback_host, split_host_port
+
+
+def make_step(concurrency, throughput, wait_share):
+    return {'concurrency': concurrency, 'throughput': throughput, 'checkoutWaitShare': wait_share}
+
+
+class ParseMongoHostsTest(unittest.TestCase):
+    def parse(self, mongo_url):
+        return PoolSaturationTester(mongo_url=mongo_url).parse_mongo_hosts()
+
+    def test_single_host_defaults_port(self):
+        self.assertEqual(self.parse("mongodb://localhost"), [('localhost', 27017)])
+
+    def test_replica_set_seed_list(self):
+        hosts = self.parse("mongodb://localhost:27017,localhost:27018/?replicaSet=rs0")
+        self.assertEqual(hosts, [('localhost', 27017), ('localhost', 27018)])
+
+    def test_credentials_and_ipv6(self):
+        self.assertEqual(self.parse("mongodb://user:p%40ss@[::1]:27019/db"), [('::1', 27019)])
+
+    def test_rejects_srv_scheme(self):
+        with self.assertRaises(ValueError):
+            self.parse("mongodb+srv://cluster.example.net")
+
+    def test_rejects_invalid_port(self):
+        with self.assertRaises(ValueError):
+            self.parse("mongodb://localhost:abc")
+
+    def test_rejects_empty_host(self):
+        with self.assertRaises(ValueError):
+            self.parse("mongodb://localhost:27017,/db")
+
+
+class HostHelpersTest(unittest.TestCase):
+    def test_split_driver_address(self):
+        self.assertEqual(split_host_port("127.0.0.1:27018"), ('127.0.0.1', 27018))
+        self.assertEqual(split_host_port("[::1]:27017"), ('::1', 27017))
+
+    def test_loopback_hosts(self):
+        for host in ('localhost', '127.0.0.1', '::1'):
+            self.assertTrue(is_loopback_host(host))
+        for host in ('ethicomply.preview.emergentagent.com', '10.0.0.5', None):
+            self.assertFalse(is_loopback_host(host))
+
+    def test_check_local_app_refuses_remote_url(self):
+        remote = PoolSaturationTester(base_url="https://ethicomply.preview.emergentagent.com/api")
+        self.assertFalse(remote.check_local_app())
+        self.assertTrue(PoolSaturationTester(base_url="http://[::1]:3000/api").check_local_app())
+
+    def test_check_app_servers(self):
+        tester = PoolSaturationTester()
+        local = {'servers': [{'address': 'localhost:27017'}, {'address': '127.0.0.1:27018'}]}
+        remote = {'servers': [{'address': 'localhost:27017'}, {'address': 'db.example.net:27017'}]}
+        self.assertTrue(tester.check_app_servers(local))
+        self.assertFalse(tester.check_app_servers(remote))
+        self.assertFalse(tester.check_app_servers({'servers': []}))
+
+
+class FindKneeTest(unittest.TestCase):
+    def test_first_step_at_threshold(self):
+        tester = PoolSaturationTester(dominance_threshold=0.5)
+        tester.steps = [make_step(1, 10, 0.01), make_step(2, 20, 0.3), make_step(4, 22, 0.5),
+                        make_step(8, 22, 0.8)]
+        self.assertEqual(tester.find_knee()['concurrency'], 4)
+
+    def test_none_when_threshold_not_reached(self):
+        tester = PoolSaturationTester(dominance_threshold=0.5)
+        tester.steps = [make_step(1, 10, 0.01), make_step(2, 20, 0.49)]
+        self.assertIsNone(tester.find_knee())
+
+
+class FindThroughputKneeTest(unittest.TestCase):
+    def test_knee_where_throughput_flattens(self):
+        tester = PoolSaturationTester()
+        tester.steps = [make_step(c, t, 0) for c, t in [(1, 10), (2, 20), (4, 40), (8, 44), (16, 45)]]
+        self.assertEqual(tester.find_throughput_knee()['concurrency'], 4)
+
+    def test_none_for_linear_curve(self):
+        tester = PoolSaturationTester()
+        tester.steps = [make_step(c, 10 * c, 0) for c in (1, 2, 4, 8)]
+        self.assertIsNone(tester.find_throughput_knee())
+
+    def test_none_with_too_few_steps(self):
+        tester = PoolSaturationTester()
+        tester.steps = [make_step(1, 10, 0), make_step(2, 20, 0)]
+        self.assertIsNone(tester.find_throughput_knee())
+
+
+if __name__ == "__main__":
+    unittest.main()